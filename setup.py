@@ -7,6 +7,7 @@ from setuptools import (
 extras_require = {
     'test': [
         'cryptography',
+        'freezegun',
         'pytest-cov',
         'pytest-django',
         'pytest-xdist',
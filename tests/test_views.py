@@ -1,7 +1,7 @@
 from datetime import timedelta
-from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from freezegun import freeze_time
 
 from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import (
@@ -13,47 +13,98 @@ from rest_framework_simplejwt.utils import (
 
 from .utils import APIViewTestCase, override_api_settings
 
-
-class TestTokenObtainPairView(APIViewTestCase):
-    view_name = 'token_obtain_pair'
-
-    def setUp(self):
-        self.username = 'test_user'
-        self.password = 'test_password'
-
-        self.user = get_user_model().objects.create_user(
-            username=self.username,
-            password=self.password,
+User = get_user_model()
+USERNAME_FIELD = User.USERNAME_FIELD
+
+# Canned invalid token strings shared by the failure-path tests below.
+# Those tests assert that verification rejects the tokens, not anything
+# about fresh 'iat'/'jti' values, so each string is signed only once for
+# the whole module.  Built in setUpModule so that api_settings has been
+# resolved against the final test settings first.
+NO_EXP_REFRESH_TOKEN = None
+EXPIRED_REFRESH_TOKEN = None
+NO_EXP_SLIDING_TOKEN = None
+EXPIRED_SLIDING_TOKEN = None
+NO_REFRESH_EXP_SLIDING_TOKEN = None
+REFRESH_PERIOD_EXPIRED_SLIDING_TOKEN = None
+
+
+def setUpModule():
+    global NO_EXP_REFRESH_TOKEN, EXPIRED_REFRESH_TOKEN
+    global NO_EXP_SLIDING_TOKEN, EXPIRED_SLIDING_TOKEN
+    global NO_REFRESH_EXP_SLIDING_TOKEN, REFRESH_PERIOD_EXPIRED_SLIDING_TOKEN
+
+    token = RefreshToken()
+    del token['exp']
+    NO_EXP_REFRESH_TOKEN = str(token)
+
+    token.set_exp(lifetime=-timedelta(seconds=1))
+    EXPIRED_REFRESH_TOKEN = str(token)
+
+    token = SlidingToken()
+    del token['exp']
+    NO_EXP_SLIDING_TOKEN = str(token)
+
+    token.set_exp(lifetime=-timedelta(seconds=1))
+    EXPIRED_SLIDING_TOKEN = str(token)
+
+    refresh_exp_claim = api_settings.SLIDING_TOKEN_REFRESH_EXP_CLAIM
+
+    token = SlidingToken()
+    del token[refresh_exp_claim]
+    NO_REFRESH_EXP_SLIDING_TOKEN = str(token)
+
+    token = SlidingToken()
+    token.set_exp(refresh_exp_claim, lifetime=-timedelta(seconds=1))
+    REFRESH_PERIOD_EXPIRED_SLIDING_TOKEN = str(token)
+
+
+class _ObtainTokenTestsMixin:
+    """
+    Tests shared by the pair and sliding token obtain views.  Concrete
+    subclasses set ``view_name`` along with the response and cookie keys
+    expected on success.
+    """
+    success_keys = None
+    cookie_keys = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.username = 'test_user'
+        cls.password = 'test_password'
+
+        cls.user = User.objects.create_user(
+            username=cls.username,
+            password=cls.password,
         )
 
     def test_fields_missing(self):
-        res = self.view_post(data={})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn(get_user_model().USERNAME_FIELD, res.data)
-        self.assertIn('password', res.data)
-
-        res = self.view_post(data={get_user_model().USERNAME_FIELD: self.username})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn('password', res.data)
-
-        res = self.view_post(data={'password': self.password})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn(get_user_model().USERNAME_FIELD, res.data)
+        cases = (
+            ({}, {USERNAME_FIELD, 'password'}),
+            ({USERNAME_FIELD: self.username}, {'password'}),
+            ({'password': self.password}, {USERNAME_FIELD}),
+        )
+        for data, expected_fields in cases:
+            with self.subTest(data=data):
+                res = self.view_post(data=data)
+                self.assertEqual(res.status_code, 400)
+                self.assertLessEqual(expected_fields, res.data.keys())
 
     def test_credentials_wrong(self):
         res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
+            USERNAME_FIELD: self.username,
             'password': 'test_user',
         })
         self.assertEqual(res.status_code, 401)
         self.assertIn('detail', res.data)
 
     def test_user_inactive(self):
+        self.user.refresh_from_db()
         self.user.is_active = False
-        self.user.save()
+        self.user.save(update_fields=['is_active'])
 
         res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
+            USERNAME_FIELD: self.username,
             'password': self.password,
         })
         self.assertEqual(res.status_code, 401)
@@ -61,33 +112,40 @@ class TestTokenObtainPairView(APIViewTestCase):
 
     def test_success(self):
         res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
+            USERNAME_FIELD: self.username,
             'password': self.password,
         })
         self.assertEqual(res.status_code, 200)
-        self.assertIn('access', res.data)
-        self.assertIn('refresh', res.data)
+        self.assertLessEqual(self.success_keys, res.data.keys())
+
+    @override_api_settings(AUTH_COOKIE='authorization')
+    def test_success_with_auth_cookie(self):
+        res = self.view_post(data={
+            USERNAME_FIELD: self.username,
+            'password': self.password,
+        })
+        self.assertEqual(res.status_code, 200)
+        self.assertLessEqual(self.cookie_keys, res.cookies.keys())
 
-        with override_api_settings(AUTH_COOKIE='authorization'):
-            res = self.view_post(data={
-                get_user_model().USERNAME_FIELD: self.username,
-                'password': self.password,
-            })
-            self.assertEqual(res.status_code, 200)
-            self.assertIn('authorization', res.cookies)
-            self.assertIn('authorization_refresh', res.cookies)
+
+class TestTokenObtainPairView(_ObtainTokenTestsMixin, APIViewTestCase):
+    view_name = 'token_obtain_pair'
+
+    success_keys = {'access', 'refresh'}
+    cookie_keys = {'authorization', 'authorization_refresh'}
 
 
 class TestTokenRefreshView(APIViewTestCase):
     view_name = 'token_refresh'
 
-    def setUp(self):
-        self.username = 'test_user'
-        self.password = 'test_password'
+    @classmethod
+    def setUpTestData(cls):
+        cls.username = 'test_user'
+        cls.password = 'test_password'
 
-        self.user = get_user_model().objects.create_user(
-            username=self.username,
-            password=self.password,
+        cls.user = User.objects.create_user(
+            username=cls.username,
+            password=cls.password,
         )
 
     def test_fields_missing(self):
@@ -96,111 +154,52 @@ class TestTokenRefreshView(APIViewTestCase):
         self.assertIn('refresh', res.data)
 
     def test_it_should_return_401_if_token_invalid(self):
-        token = RefreshToken()
-        del token['exp']
-
-        res = self.view_post(data={'refresh': str(token)})
+        res = self.view_post(data={'refresh': NO_EXP_REFRESH_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
-        token.set_exp(lifetime=-timedelta(seconds=1))
-
-        res = self.view_post(data={'refresh': str(token)})
+        res = self.view_post(data={'refresh': EXPIRED_REFRESH_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
+    @freeze_time('2024-01-01 12:00:00')
     def test_it_should_return_access_token_if_everything_ok(self):
+        lifetime = api_settings.ACCESS_TOKEN_LIFETIME
+
         refresh = RefreshToken()
         refresh['test_claim'] = 'arst'
 
-        # View returns 200
-        now = aware_utcnow() - api_settings.ACCESS_TOKEN_LIFETIME / 2
-
-        with patch('rest_framework_simplejwt.tokens.aware_utcnow') as fake_aware_utcnow:
-            fake_aware_utcnow.return_value = now
-
-            res = self.view_post(data={'refresh': str(refresh)})
+        now = aware_utcnow()
+        expected_exp = datetime_to_epoch(now + lifetime)
 
+        # View returns 200
+        res = self.view_post(data={'refresh': str(refresh)})
         self.assertEqual(res.status_code, 200)
 
         access = AccessToken(res.data['access'])
 
         self.assertEqual(refresh['test_claim'], access['test_claim'])
-        self.assertEqual(access['exp'], datetime_to_epoch(now + api_settings.ACCESS_TOKEN_LIFETIME))
+        self.assertEqual(access['exp'], expected_exp)
 
 
-class TestTokenObtainSlidingView(APIViewTestCase):
+class TestTokenObtainSlidingView(_ObtainTokenTestsMixin, APIViewTestCase):
     view_name = 'token_obtain_sliding'
 
-    def setUp(self):
-        self.username = 'test_user'
-        self.password = 'test_password'
-
-        self.user = get_user_model().objects.create_user(
-            username=self.username,
-            password=self.password,
-        )
-
-    def test_fields_missing(self):
-        res = self.view_post(data={})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn(get_user_model().USERNAME_FIELD, res.data)
-        self.assertIn('password', res.data)
-
-        res = self.view_post(data={get_user_model().USERNAME_FIELD: self.username})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn('password', res.data)
-
-        res = self.view_post(data={'password': self.password})
-        self.assertEqual(res.status_code, 400)
-        self.assertIn(get_user_model().USERNAME_FIELD, res.data)
-
-    def test_credentials_wrong(self):
-        res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
-            'password': 'test_user',
-        })
-        self.assertEqual(res.status_code, 401)
-        self.assertIn('detail', res.data)
-
-    def test_user_inactive(self):
-        self.user.is_active = False
-        self.user.save()
-
-        res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
-            'password': self.password,
-        })
-        self.assertEqual(res.status_code, 401)
-        self.assertIn('detail', res.data)
-
-    def test_success(self):
-        res = self.view_post(data={
-            get_user_model().USERNAME_FIELD: self.username,
-            'password': self.password,
-        })
-        self.assertEqual(res.status_code, 200)
-        self.assertIn('token', res.data)
-
-        with override_api_settings(AUTH_COOKIE='authorization'):
-            res = self.view_post(data={
-                get_user_model().USERNAME_FIELD: self.username,
-                'password': self.password,
-            })
-            self.assertEqual(res.status_code, 200)
-            self.assertIn('authorization', res.cookies)
+    success_keys = {'token'}
+    cookie_keys = {'authorization'}
 
 
 class TestTokenRefreshSlidingView(APIViewTestCase):
     view_name = 'token_refresh_sliding'
 
-    def setUp(self):
-        self.username = 'test_user'
-        self.password = 'test_password'
+    @classmethod
+    def setUpTestData(cls):
+        cls.username = 'test_user'
+        cls.password = 'test_password'
 
-        self.user = get_user_model().objects.create_user(
-            username=self.username,
-            password=self.password,
+        cls.user = User.objects.create_user(
+            username=cls.username,
+            password=cls.password,
         )
 
     def test_fields_missing(self):
@@ -209,41 +208,32 @@ class TestTokenRefreshSlidingView(APIViewTestCase):
         self.assertIn('token', res.data)
 
     def test_it_should_return_401_if_token_invalid(self):
-        token = SlidingToken()
-        del token['exp']
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': NO_EXP_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
-        token.set_exp(lifetime=-timedelta(seconds=1))
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': EXPIRED_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
     def test_it_should_return_401_if_token_has_no_refresh_exp_claim(self):
-        token = SlidingToken()
-        del token[api_settings.SLIDING_TOKEN_REFRESH_EXP_CLAIM]
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': NO_REFRESH_EXP_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
     def test_it_should_return_401_if_token_has_refresh_period_expired(self):
-        token = SlidingToken()
-        token.set_exp(api_settings.SLIDING_TOKEN_REFRESH_EXP_CLAIM, lifetime=-timedelta(seconds=1))
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': REFRESH_PERIOD_EXPIRED_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
+    @freeze_time('2024-01-01 12:00:00')
     def test_it_should_update_token_exp_claim_if_everything_ok(self):
+        lifetime = api_settings.SLIDING_TOKEN_LIFETIME
         now = aware_utcnow()
 
         token = SlidingToken()
-        exp = now + api_settings.SLIDING_TOKEN_LIFETIME - timedelta(seconds=1)
-        token.set_exp(from_time=now, lifetime=api_settings.SLIDING_TOKEN_LIFETIME - timedelta(seconds=1))
+        exp = now + lifetime - timedelta(seconds=1)
+        token.set_exp(from_time=now, lifetime=lifetime - timedelta(seconds=1))
 
         # View returns 200
         res = self.view_post(data={'token': str(token)})
@@ -259,45 +249,44 @@ class TestTokenRefreshSlidingView(APIViewTestCase):
 class TestTokenVerifyView(APIViewTestCase):
     view_name = 'token_verify'
 
-    def setUp(self):
-        self.username = 'test_user'
-        self.password = 'test_password'
+    @classmethod
+    def setUpTestData(cls):
+        cls.username = 'test_user'
+        cls.password = 'test_password'
 
-        self.user = get_user_model().objects.create_user(
-            username=self.username,
-            password=self.password,
+        cls.user = User.objects.create_user(
+            username=cls.username,
+            password=cls.password,
         )
 
+        # Token strings are deterministic for a fixed payload, so sign
+        # the reusable ones once per class instead of once per test
+        cls.valid_refresh_str = str(RefreshToken())
+
+        token = RefreshToken()
+        token[api_settings.TOKEN_TYPE_CLAIM] = 'fake_type'
+        cls.fake_type_token_str = str(token)
+
     def test_fields_missing(self):
         res = self.view_post(data={})
         self.assertEqual(res.status_code, 400)
         self.assertIn('token', res.data)
 
     def test_it_should_return_401_if_token_invalid(self):
-        token = SlidingToken()
-        del token['exp']
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': NO_EXP_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
-        token.set_exp(lifetime=-timedelta(seconds=1))
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': EXPIRED_SLIDING_TOKEN})
         self.assertEqual(res.status_code, 401)
         self.assertEqual(res.data['code'], 'token_not_valid')
 
     def test_it_should_return_200_if_everything_okay(self):
-        token = RefreshToken()
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': self.valid_refresh_str})
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(len(res.data), 0)
+        self.assertFalse(res.data)
 
     def test_it_should_ignore_token_type(self):
-        token = RefreshToken()
-        token[api_settings.TOKEN_TYPE_CLAIM] = 'fake_type'
-
-        res = self.view_post(data={'token': str(token)})
+        res = self.view_post(data={'token': self.fake_type_token_str})
         self.assertEqual(res.status_code, 200)
-        self.assertEqual(len(res.data), 0)
+        self.assertFalse(res.data)
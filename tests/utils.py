@@ -1,4 +1,5 @@
 import contextlib
+from http.cookies import SimpleCookie
 
 from django.db import connection
 from django.db.migrations.executor import MigrationExecutor
@@ -30,6 +31,22 @@ def client_action_wrapper(action):
 class APIViewTestCase(TestCase):
     client_class = APIClient
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # One client (and hence one loaded middleware chain) per class.
+        # Per-test isolation only requires clearing auth and cookie
+        # state, not rebuilding the whole WSGI handler.
+        cls._shared_client = cls.client_class()
+
+    def _pre_setup(self):
+        super()._pre_setup()
+
+        self._shared_client.credentials()
+        self._shared_client.cookies = SimpleCookie()
+        self.client = self._shared_client
+
     def authenticate_with_token(self, type, token):
         """
         Authenticates requests with the given token.